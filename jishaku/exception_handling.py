@@ -12,17 +12,29 @@ Functions and classes for handling exceptions.
 """
 
 import asyncio
+import io
 import subprocess
 import sys
 import traceback
 import typing
+import weakref
 from types import TracebackType
 
 import discord
 from discord.ext import commands
 
 from jishaku.flags import Flags
-from jishaku.paginators import Interface, MAX_MESSAGE_SIZE
+from jishaku.paginators import Interface, MAX_MESSAGE_SIZE, encode_for_file
+
+_ERROR_COLOUR = discord.Colour.red()
+
+
+def _make_error_embed(description: typing.Optional[str] = None) -> discord.Embed:
+    """
+    Creates the embed used to present tracebacks.
+    """
+
+    return discord.Embed(title="Error", colour=_ERROR_COLOUR, description=description)
 
 
 async def send_traceback(
@@ -40,28 +52,42 @@ async def send_traceback(
 
     :param destination: Where to send this information to
     :param verbosity: How far back this traceback should go. 0 shows just the last stack.
+                      A negative value shows only the exception itself, without any stack.
     :param send_to_author: Whether to send this to the author of the message.
     :param exc_info: Information about this exception, from sys.exc_info or similar.
     :return: The last message sent
     """
 
-    traceback_content = "".join(traceback.format_exception(etype, value, trace, verbosity)).replace("``", "`\u200b`")
+    if verbosity < 0:
+        traceback_content = "".join(traceback.format_exception_only(etype, value))
+    else:
+        buffer = io.StringIO()
+        traceback.print_exception(etype, value, trace, verbosity, file=buffer)
+        traceback_content = buffer.getvalue()
 
-    if len(traceback_content) <= MAX_MESSAGE_SIZE - 10:
+    send = destination.reply if isinstance(destination, discord.Message) else destination.send
+
+    # escape codeblock markdown for display in messages, file uploads use the raw content
+    escaped_content = traceback_content.replace("``", "`\u200b`")
+
+    if len(escaped_content) <= MAX_MESSAGE_SIZE - 10:
         if Flags.NO_EMBEDS:
-            if isinstance(destination, discord.Message):
-                return await destination.reply(f"```py\n{traceback_content}\n```")
-            return await destination.send(f"```py\n{traceback_content}\n```")
-        else:
-            if isinstance(destination, discord.Message):
-                return await destination.reply(embed=discord.Embed(title="Error", color=discord.Colour.red(), description=f"```py\n{traceback_content}\n```"))
-            return await destination.send(embed=discord.Embed(title="Error", color=discord.Colour.red(), description=f"```py\n{traceback_content}\n```"))
+            return await send(f"```py\n{escaped_content}\n```")
+        return await send(embed=_make_error_embed(f"```py\n{escaped_content}\n```"))
+
+    encoded = encode_for_file(bot, owner, traceback_content)
+
+    if encoded is not None:  # File "full content" preview limit
+        file = discord.File(filename="traceback.py", fp=io.BytesIO(encoded))
+        if Flags.NO_EMBEDS:
+            return await send("Error", file=file)
+        return await send(embed=_make_error_embed(), file=file)
 
     paginator = commands.Paginator(prefix="```py", max_size=MAX_MESSAGE_SIZE - 20)
-    for line in traceback_content.split("\n"):
+    for line in escaped_content.split("\n"):
         paginator.add_line(line)
 
-    interface = Interface(bot, paginator, owner=owner, embed=discord.Embed(title="Error", color=discord.Colour.red()))
+    interface = Interface(bot, paginator, owner=owner, embed=_make_error_embed())
     return await interface.send_to(destination.channel if isinstance(destination, discord.Message) else destination)
 
 
@@ -92,26 +118,45 @@ async def do_after_sleep(delay: float, coro: typing.Callable[P, typing.Awaitable
     return await coro(*args, **kwargs)
 
 
-async def attempt_add_reaction(msg: discord.Message, reaction: typing.Union[str, discord.Emoji]) -> typing.Optional[discord.Reaction]:
+# Reactions are ratelimited per channel, so only this many are attempted in a channel at once.
+# Any further attempts wait for their turn, except droppable ones, which would arrive stale and are skipped.
+REACTION_CONCURRENCY = 3
+_REACTION_SEMAPHORES: typing.MutableMapping[int, asyncio.Semaphore] = weakref.WeakValueDictionary()
+
+
+async def attempt_add_reaction(
+    msg: discord.Message, reaction: typing.Union[str, discord.Emoji], *, droppable: bool = False
+) -> typing.Optional[discord.Reaction]:
     """
     Try to add a reaction to a message, ignoring it if it fails for any reason.
 
     :param msg: The message to add the reaction to.
     :param reaction: The reaction emoji, could be a string or `discord.Emoji`
+    :param droppable: Whether to skip the reaction if too many are already being added in the same channel.
+                      Only progress reactions should be droppable, as status reactions may be the only sign of a result.
     :return: A `discord.Reaction` or None, depending on if it failed or not.
     """
     if Flags.NO_REACTION:
         return
 
-    try:
-        return await msg.add_reaction(reaction)
-    except discord.HTTPException:
-        pass
+    semaphore = _REACTION_SEMAPHORES.get(msg.channel.id)
+
+    if semaphore is None:
+        semaphore = _REACTION_SEMAPHORES[msg.channel.id] = asyncio.Semaphore(REACTION_CONCURRENCY)
+    elif droppable and semaphore.locked():
+        # the channel is saturated, so this would likely just be ratelimited
+        return
+
+    async with semaphore:
+        try:
+            return await msg.add_reaction(reaction)
+        except discord.HTTPException:
+            pass
 
 
 class ReplResponseReactor:  # pylint: disable=too-few-public-methods
     """
-    Extension of the ReactionProcedureTimer that absorbs errors, sending tracebacks.
+    Async context manager that reacts to the progress of a command, absorbing errors and sending their tracebacks.
     """
 
     __slots__ = ("bot", "message", "loop", "handle", "raised")
@@ -119,14 +164,22 @@ class ReplResponseReactor:  # pylint: disable=too-few-public-methods
     def __init__(self, bot: commands.Bot, message: discord.Message, loop: typing.Optional[asyncio.BaseEventLoop] = None):
         self.bot = bot
         self.message = message
-        self.loop = loop or asyncio.get_event_loop()
+        self.loop = loop
         self.handle = None
         self.raised = False
 
     async def __aenter__(self):
-        self.handle = self.loop.create_task(do_after_sleep(2, attempt_add_reaction, self.message, "\N{BLACK RIGHT-POINTING TRIANGLE}"))
+        # don't bother scheduling a reaction that will never be added
+        if not Flags.NO_REACTION:
+            loop = self.loop or asyncio.get_running_loop()
+            self.handle = loop.call_later(2, self._add_running_reaction)
+
         return self
 
+    def _add_running_reaction(self):
+        # replace the timer with the reaction task, so it is still cancelled if we finish mid-request
+        self.handle = asyncio.ensure_future(attempt_add_reaction(self.message, "\N{BLACK RIGHT-POINTING TRIANGLE}", droppable=True))
+
     async def __aexit__(self, exc_type: typing.Type[BaseException], exc_val: BaseException, exc_tb: TracebackType) -> bool:
         if self.handle:
             self.handle.cancel()
@@ -141,28 +194,23 @@ class ReplResponseReactor:  # pylint: disable=too-few-public-methods
         if isinstance(exc_val, (SyntaxError, asyncio.TimeoutError, subprocess.TimeoutExpired)):
             # short traceback, send to channel
             destination = Flags.traceback_destination(self.message) or self.message.channel
-
-            if destination != self.message.channel:
-                await attempt_add_reaction(
-                    self.message,
-                    # timed out is alarm clock
-                    # syntax error is single exclamation mark
-                    "\N{HEAVY EXCLAMATION MARK SYMBOL}" if isinstance(exc_val, SyntaxError) else "\N{ALARM CLOCK}",
-                )
-
-            await send_traceback(
-                self.bot, self.message if destination == self.message.channel else destination, 0, exc_type, exc_val, exc_tb, self.message.author
-            )
+            verbosity = -1
+            # timed out is alarm clock
+            # syntax error is single exclamation mark
+            reaction = "\N{HEAVY EXCLAMATION MARK SYMBOL}" if isinstance(exc_val, SyntaxError) else "\N{ALARM CLOCK}"
         else:
+            # this traceback likely needs more info, so increase verbosity, and DM it instead.
             destination = Flags.traceback_destination(self.message) or self.message.author
+            verbosity = 8
+            # other error, double exclamation mark
+            reaction = "\N{DOUBLE EXCLAMATION MARK}"
 
-            if destination != self.message.channel:
-                # other error, double exclamation mark
-                await attempt_add_reaction(self.message, "\N{DOUBLE EXCLAMATION MARK}")
+        in_channel = destination == self.message.channel
 
-            # this traceback likely needs more info, so increase verbosity, and DM it instead.
-            await send_traceback(
-                self.bot, self.message if destination == self.message.channel else destination, 8, exc_type, exc_val, exc_tb, self.message.author
-            )
+        if not in_channel:
+            await attempt_add_reaction(self.message, reaction)
+
+        # tracebacks in the same channel reply to the message that caused them
+        await send_traceback(self.bot, self.message if in_channel else destination, verbosity, exc_type, exc_val, exc_tb, self.message.author)
 
         return True  # the exception has been handled
@@ -24,10 +24,32 @@ from jishaku.exception_handling import ReplResponseReactor
 from jishaku.features.baseclass import Feature
 from jishaku.flags import Flags
 from jishaku.functools import AsyncSender
-from jishaku.paginators import Interface, PaginatorInterface, PaginatorEmbedInterface, MAX_MESSAGE_SIZE, WrappedPaginator, use_file_check
+from jishaku.paginators import Interface, PaginatorInterface, PaginatorEmbedInterface, MAX_MESSAGE_SIZE, WrappedPaginator, encode_for_file, use_file_check
 from jishaku.repl import AsyncCodeExecutor, Scope, all_inspections, create_tree, disassemble, get_var_dict_from_ctx
+from jishaku.repl.repl_builtins import close_session
 from jishaku.types import ContextA
 
+REPL_EXIT_COMMANDS = frozenset(("exit()", "quit()"))
+REPL_EXIT_HINTS = frozenset(("exit", "quit"))
+
+_RESULT_COLOUR = discord.Colour.green()
+_NO_MENTIONS = discord.AllowedMentions.none()
+
+# The event loop only keeps weak references to tasks, so tasks nothing else waits on are kept here until they finish
+_BACKGROUND_TASKS: "typing.Set[asyncio.Task[None]]" = set()
+
+
+def scrub_token(text: str, token: typing.Optional[str]) -> str:
+    """
+    Removes a bot token from text, if it is present.
+    """
+
+    # the membership check is cheaper than a replace, and the token is rarely present
+    if token and token in text:
+        return text.replace(token, "[token omitted]")
+
+    return text
+
 
 class PythonFeature(Feature):
     """
@@ -39,7 +61,18 @@ class PythonFeature(Feature):
         self._scope = Scope()
         self.retain = Flags.RETAIN
         self.last_result: typing.Any = None
-        self.repl_sessions = set()
+        self.repl_sessions: typing.Set[int] = set()
+
+    # discord.py 1.7 calls cog_unload synchronously, while 2.x accepts either form
+    def cog_unload(self):  # pylint: disable=invalid-overridden-method
+        # don't leave the REPL's shared HTTP session open once the cog is gone
+        try:
+            task = asyncio.get_running_loop().create_task(close_session())
+        except RuntimeError:
+            return
+
+        _BACKGROUND_TASKS.add(task)
+        task.add_done_callback(_BACKGROUND_TASKS.discard)
 
     @property
     def scope(self):
@@ -90,45 +123,42 @@ class PythonFeature(Feature):
         What you return is what gets stored in the temporary _ variable.
         """
 
-        if isinstance(result, discord.Message) and Flags.REPLACE_MESSAGES:
-            result = f"<Message <{result.jump_url}>>"
-
-        if isinstance(result, discord.File):
-            return await ctx.send(file=result)
-
-        if isinstance(result, discord.Embed):
-            return await ctx.send(embed=result)
-
-        if isinstance(result, (Interface, PaginatorInterface, PaginatorEmbedInterface)):
-            return await result.send_to(ctx)
-
+        # strings need no special handling, so they can skip the type checks entirely
         if not isinstance(result, str):
-            # repr all non-strings
-            result = repr(result)
+            if isinstance(result, discord.Message) and Flags.REPLACE_MESSAGES:
+                result = f"<Message <{result.jump_url}>>"
+            elif isinstance(result, discord.File):
+                return await ctx.send(file=result)
+            elif isinstance(result, discord.Embed):
+                return await ctx.send(embed=result)
+            elif isinstance(result, (Interface, PaginatorInterface, PaginatorEmbedInterface)):
+                return await result.send_to(ctx)
+            else:
+                # repr all other non-strings
+                result = repr(result)
 
-        result = result.replace(self.bot.http.token, "[token omitted]")
+        result = scrub_token(result, self.bot.http.token)
 
         # Eventually the below handling should probably be put somewhere else
         if len(result) <= MAX_MESSAGE_SIZE - 10:
             if result.strip() == "":
                 result = "\u200b"
 
-            if self.bot.http.token:
-                result = result.replace(self.bot.http.token, "[token omitted]")
-
             if Flags.NO_EMBEDS:
-                return await ctx.send(f"```py\n{result}\n```", allowed_mentions=discord.AllowedMentions.none())
+                return await ctx.send(f"```py\n{result}\n```", allowed_mentions=_NO_MENTIONS)
             else:
-                embed = discord.Embed(title="Result", color=discord.Colour.green(), description=f"```py\n{result}\n```")
-                return await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+                embed = discord.Embed(title="Result", colour=_RESULT_COLOUR, description=f"```py\n{result}\n```")
+                return await ctx.send(embed=embed, allowed_mentions=_NO_MENTIONS)
+
+        encoded = encode_for_file(ctx.bot, ctx.author, result)
 
-        if use_file_check(ctx, len(result)):  # File "full content" preview limit
+        if encoded is not None:  # File "full content" preview limit
             # Discord's desktop and web client now supports an interactive file content
             #  display for files encoded in UTF-8.
             # Since this avoids escape issues and is more intuitive than pagination for
             #  long results, it will now be prioritized over Interface if the
             #  resultant content is below the filesize threshold
-            return await ctx.send(file=discord.File(filename="output.py", fp=io.BytesIO(result.encode("utf-8"))))
+            return await ctx.send(file=discord.File(filename="output.py", fp=io.BytesIO(encoded)))
 
         paginator = WrappedPaginator(prefix="```py", suffix="```", max_size=MAX_MESSAGE_SIZE - 20)
 
@@ -150,16 +180,19 @@ class PythonFeature(Feature):
         convertables: typing.Dict[str, str] = {}
 
         for index, user in enumerate(ctx.message.mentions):
-            arg_dict[f"__user_mention_{index}"] = user
-            convertables[user.mention] = f"__user_mention_{index}"
+            name = f"__user_mention_{index}"
+            arg_dict[name] = user
+            convertables[user.mention] = name
 
         for index, channel in enumerate(ctx.message.channel_mentions):
-            arg_dict[f"__channel_mention_{index}"] = channel
-            convertables[channel.mention] = f"__channel_mention_{index}"
+            name = f"__channel_mention_{index}"
+            arg_dict[name] = channel
+            convertables[channel.mention] = name
 
         for index, role in enumerate(ctx.message.role_mentions):
-            arg_dict[f"__role_mention_{index}"] = role
-            convertables[role.mention] = f"__role_mention_{index}"
+            name = f"__role_mention_{index}"
+            arg_dict[name] = role
+            convertables[role.mention] = name
 
         return arg_dict, convertables
 
@@ -191,7 +224,9 @@ class PythonFeature(Feature):
                         send(await self.jsk_python_result_handling(ctx, result))
 
         finally:
-            scope.clear_intersection(arg_dict)
+            # a scope that isn't retained is discarded anyway, so there's nothing to clean up
+            if scope is self._scope:
+                scope.clear_intersection(arg_dict)
 
     @Feature.Command(parent="jsk", name="repl")
     async def jsk_repl(self, ctx: ContextA):
@@ -217,43 +252,58 @@ class PythonFeature(Feature):
         self.repl_sessions.add(ctx.channel.id)
         await ctx.send(banner)
 
-        def check(m):
-            return m.author.id == ctx.author.id and m.channel.id == ctx.channel.id and (True if Flags.NO_REPL_PREFIX else m.content.startswith("`"))
-
-        while True:
-            try:
-                response = await self.bot.wait_for("message", check=check, timeout=10.0 * 60.0)
-            except asyncio.TimeoutError:
-                await ctx.send("Exiting...")
-                self.repl_sessions.remove(ctx.channel.id)
-                break
-
-            argument = codeblock_converter(response.content)
-
-            if argument.content in ("exit()", "quit()"):
-                await ctx.send("Exiting...")
-                self.repl_sessions.remove(ctx.channel.id)
-                return
-            elif argument.content in ("exit", "quit"):
-                await ctx.send(f"Use `{argument.content}()` to exit.")
-                continue
-
-            arg_dict["message"] = arg_dict["msg"] = response
-
-            try:
-                async with ReplResponseReactor(ctx.bot, response):
-                    with self.submit(ctx):
-                        executor = AsyncCodeExecutor(argument.content, scope, arg_dict=arg_dict)
-                        async for send, result in AsyncSender(executor):
-                            if result is None:
-                                continue
+        # this check runs for every message the bot receives, so look up what it needs ahead of time
+        author_id = ctx.author.id
+        channel_id = ctx.channel.id
 
-                            self.last_result = result
-
-                            send(await self.jsk_python_result_handling(ctx, result))
+        def check(m):
+            return m.author.id == author_id and m.channel.id == channel_id and (Flags.NO_REPL_PREFIX or m.content.startswith("`"))
 
-            finally:
-                scope.clear_intersection(arg_dict)
+        try:
+            while True:
+                try:
+                    response = await self.bot.wait_for("message", check=check, timeout=10.0 * 60.0)
+                except asyncio.TimeoutError:
+                    await ctx.send("Exiting...")
+                    break
+
+                # check for exit commands before parsing, so they don't pay for a codeblock conversion
+                command = response.content.strip().strip("`")
+
+                if command in REPL_EXIT_COMMANDS:
+                    await ctx.send("Exiting...")
+                    return
+                if command in REPL_EXIT_HINTS:
+                    await ctx.send(f"Use `{command}()` to exit.")
+                    continue
+
+                content = response.content
+
+                # single backtick one-liners are the most common input, and can be unwrapped without a full conversion
+                if len(content) > 1 and content.startswith("`") and not content.startswith("``") and content.endswith("`") and "```" not in content:
+                    argument = Codeblock("", content[1:-1])
+                else:
+                    argument = codeblock_converter(content)
+
+                arg_dict["message"] = arg_dict["msg"] = response
+
+                try:
+                    async with ReplResponseReactor(ctx.bot, response):
+                        with self.submit(ctx):
+                            executor = AsyncCodeExecutor(argument.content, scope, arg_dict=arg_dict)
+                            async for send, result in AsyncSender(executor):
+                                if result is None:
+                                    continue
+
+                                self.last_result = result
+
+                                send(await self.jsk_python_result_handling(ctx, result))
+                finally:
+                    # other commands can use a retained scope while the session waits, so don't leave this message's variables in it
+                    if scope is self._scope:
+                        scope.clear_intersection(arg_dict)
+        finally:
+            self.repl_sessions.discard(ctx.channel.id)
 
     @Feature.Command(parent="jsk", name="py_inspect", aliases=["pyi", "python_inspect", "pythoninspect"])
     async def jsk_python_inspect(self, ctx: ContextA, *, argument: codeblock_converter):  # type: ignore
@@ -277,10 +327,19 @@ class PythonFeature(Feature):
 
                         self.last_result = result
 
-                        header = repr(result).replace("``", "`\u200b`")
+                        header = repr(result)
+                        token = self.bot.http.token
 
-                        if self.bot.http.token:
-                            header = header.replace(self.bot.http.token, "[token omitted]")
+                        if len(header) > 485:
+                            # Only the start of the header is shown, so avoid escaping all of a long repr.
+                            # The cut leaves room to catch a token that crosses the cut-off point.
+                            # If a token is found, the lengths shift, so the full repr is kept to be safe.
+                            shown = header[: 486 + len(token or "")]
+
+                            if not token or token not in shown:
+                                header = shown
+
+                        header = scrub_token(header, token).replace("``", "`\u200b`")
 
                         if len(header) > 485:
                             header = header[0:482] + "..."
@@ -307,7 +366,8 @@ class PythonFeature(Feature):
                             interface = Interface(ctx.bot, paginator, owner=ctx.author)
                             send(await interface.send_to(ctx))
         finally:
-            scope.clear_intersection(arg_dict)
+            if scope is self._scope:
+                scope.clear_intersection(arg_dict)
 
     @Feature.Command(parent="jsk", name="dis", aliases=["disassemble"])
     async def jsk_disassemble(self, ctx: ContextA, *, argument: codeblock_converter):  # type: ignore
@@ -11,7 +11,7 @@ The jishaku root command.
 
 """
 
-import math
+import functools
 import sys
 import typing
 
@@ -34,6 +34,9 @@ try:
 except ImportError:
     from importlib_metadata import distribution, packages_distributions  # type: ignore
 
+# Looking up the version parses distribution metadata from disk, so only do it once
+_JISHAKU_VERSION = package_version("jishaku")
+
 
 def natural_size(size_in_bytes: int):
     """
@@ -44,9 +47,34 @@ def natural_size(size_in_bytes: int):
     """
     units = ("B", "KiB", "MiB", "GiB", "TiB", "PiB", "EiB", "ZiB", "YiB")
 
-    power = int(math.log(max(abs(size_in_bytes), 1), 1024))
+    # each unit is 2 ** 10 times the last, so bit length gives the unit exactly, without floating point error
+    power = max(0, min((abs(size_in_bytes).bit_length() - 1) // 10, len(units) - 1))
+
+    return f"{size_in_bytes / (1 << (10 * power)):.2f} {units[power]}"
 
-    return f"{size_in_bytes / (1024 ** power):.2f} {units[power]}"
+
+@functools.lru_cache(maxsize=None)
+def discord_distribution_version() -> str:
+    """
+    Describes the distribution that vends the `discord` package, and its version.
+
+    This is cached, as finding it means reading distribution metadata from disk, and it cannot change while running.
+    """
+
+    # Try to locate what vends the `discord` package
+    distributions: typing.List[str] = [
+        dist
+        for dist in packages_distributions()["discord"]  # type: ignore
+        if any(
+            file.parts == ("discord", "__init__.py")  # type: ignore
+            for file in distribution(dist).files  # type: ignore
+        )
+    ]
+
+    if distributions:
+        return f"{distributions[0]} `{package_version(distributions[0])}`"
+
+    return f"unknown `{discord.__version__}`"
 
 
 class RootCommand(Feature):
@@ -75,24 +103,11 @@ class RootCommand(Feature):
             embed.add_field(name=name, value="\n".join(field), inline=False)
             field = []
 
-        # Try to locate what vends the `discord` package
-        distributions: typing.List[str] = [
-            dist
-            for dist in packages_distributions()["discord"]  # type: ignore
-            if any(
-                file.parts == ("discord", "__init__.py")  # type: ignore
-                for file in distribution(dist).files  # type: ignore
-            )
-        ]
-
-        if distributions:
-            dist_version = f"{distributions[0]} `{package_version(distributions[0])}`"
-        else:
-            dist_version = f"unknown `{discord.__version__}`"
+        dist_version = discord_distribution_version()
 
         embed.description = "\n".join(
             [
-                f"Jishaku `{package_version('jishaku')}` on {dist_version}.",
+                f"Jishaku `{_JISHAKU_VERSION}` on {dist_version}.",
                 f"Python `{sys.version}` on `{sys.platform}`.".replace("\n", ""),
                 f"Module was loaded <t:{self.load_time.timestamp():.0f}:R>, " f"cog was loaded <t:{self.start_time.timestamp():.0f}:R>.",
             ]
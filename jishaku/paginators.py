@@ -19,7 +19,7 @@ from discord.ext import commands
 from jishaku.flags import Flags
 from jishaku.hljs import get_language, guess_file_traits
 from jishaku.shim.paginator_base import EmojiSettings
-from jishaku.types import ContextA
+from jishaku.types import BotT, ContextA
 
 # Version detection
 if discord.version_info >= (2, 0, 0):
@@ -37,6 +37,8 @@ __all__ = (
     "WrappedPaginator",
     "FilePaginator",
     "use_file_check",
+    "use_file_check_for",
+    "encode_for_file",
 )
 
 
@@ -187,15 +189,44 @@ def use_file_check(ctx: ContextA, size: int) -> bool:
     A check to determine if uploading a file and relying on Discord's file preview is acceptable over an Interface.
     """
 
+    return use_file_check_for(ctx.bot, ctx.author, size)
+
+
+def use_file_check_for(bot: BotT, user: typing.Union[discord.User, discord.Member], size: int) -> bool:
+    """
+    Performs :func:`use_file_check` for a given bot and recipient, for when there is no Context available.
+    """
+
     return all(
         [
             size < 50_000,  # Check the text is below the Discord cutoff point;
             not Flags.FORCE_PAGINATOR,  # Check the user hasn't explicitly disabled this;
             (
                 # Ensure the user isn't on mobile
-                not ctx.author.is_on_mobile()
-                if ctx.guild and ctx.bot.intents.presences and isinstance(ctx.author, discord.Member)
+                not user.is_on_mobile()
+                if bot.intents.presences and isinstance(user, discord.Member)
                 else True
             ),
         ]
     )
+
+
+def encode_for_file(bot: BotT, user: typing.Union[discord.User, discord.Member], text: str) -> typing.Optional[bytes]:
+    """
+    Encodes text for upload as a file, if :func:`use_file_check_for` allows it.
+
+    Returns None when the text should be paginated instead.
+    """
+
+    # The preview limit is on the size of the file, but the encoded size is never below the character count,
+    #  so the cheap check rules text out before it is encoded
+    if not use_file_check_for(bot, user, len(text)):
+        return None
+
+    try:
+        encoded = text.encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates can't be encoded, so these are left to the paginator
+        return None
+
+    return encoded if use_file_check_for(bot, user, len(encoded)) else None
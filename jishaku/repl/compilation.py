@@ -15,6 +15,7 @@ import ast
 import asyncio
 import inspect
 import linecache
+import re
 import typing
 
 import import_expression  # type: ignore
@@ -134,16 +135,21 @@ class AsyncCodeExecutor:  # pylint: disable=too-few-public-methods
                 raise
 
             try:
-                for key, value in convertables.items():
-                    code = code.replace(key, value)
+                # do all of the conversions in a single pass over the code, trying longer keys first
+                conversions = convertables
+                pattern = re.compile("|".join(re.escape(key) for key in sorted(conversions, key=len, reverse=True)))
+                code = pattern.sub(lambda match: conversions[match.group(0)], code)
                 self.code = wrap_code(code, args=", ".join(self.arg_names))
             except (SyntaxError, IndentationError) as second_error:
                 raise second_error from first_error
 
         self.scope = scope or Scope()
-        self.loop = loop or asyncio.get_event_loop()
+        self.loop = loop
 
     def __aiter__(self) -> typing.AsyncGenerator[typing.Any, typing.Any]:
+        # iteration always happens inside of a coroutine, so the running loop is the right one
+        self.loop = self.loop or asyncio.get_running_loop()
+
         exec(compile(self.code, "<repl>", "exec"), self.scope.globals, self.scope.locals)  # pylint: disable=exec-used
         func_def = self.scope.locals.get("_repl_coroutine") or self.scope.globals["_repl_coroutine"]
 
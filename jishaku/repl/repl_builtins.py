@@ -11,6 +11,7 @@ Builtin functions and variables within Jishaku REPL contexts.
 
 """
 
+import asyncio
 import typing
 
 import aiohttp
@@ -18,6 +19,51 @@ import discord
 
 from jishaku.types import ContextA
 
+# The session used by `request`, shared so that connections can be pooled and kept alive between calls.
+# Sessions are bound to the loop they are created in, so the loop is tracked alongside it.
+_SESSION: typing.Optional[aiohttp.ClientSession] = None
+_SESSION_LOOP: typing.Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Gets the :class:`aiohttp.ClientSession` shared by :func:`request`, creating it if necessary.
+
+    This must be called from within a coroutine.
+    """
+
+    global _SESSION, _SESSION_LOOP  # pylint: disable=global-statement
+
+    loop = asyncio.get_running_loop()
+
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        if _SESSION is not None and not _SESSION.closed:
+            if _SESSION_LOOP is not None and _SESSION_LOOP.is_running():
+                # The old session can only be closed from its own loop
+                asyncio.run_coroutine_threadsafe(_SESSION.close(), _SESSION_LOOP)
+            else:
+                # Its loop is gone, so it can't be closed cleanly; detach the connector so it is released silently
+                _SESSION.detach()
+
+        # Cookies are not kept, so that one request's cookies aren't sent along with later, unrelated ones
+        _SESSION = aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+        _SESSION_LOOP = loop
+
+    return _SESSION
+
+
+async def close_session():
+    """
+    Closes the :class:`aiohttp.ClientSession` shared by :func:`request`, if there is one.
+    """
+
+    global _SESSION, _SESSION_LOOP  # pylint: disable=global-statement
+
+    session, _SESSION, _SESSION_LOOP = _SESSION, None, None
+
+    if session is not None:
+        await session.close()
+
 
 async def request(*args, **kwargs) -> typing.Union[bytes, dict]:
     """
@@ -30,13 +76,12 @@ async def request(*args, **kwargs) -> typing.Union[bytes, dict]:
 
     json = kwargs.pop("json", True)
 
-    async with aiohttp.ClientSession() as session:
-        async with session.request(*args, **kwargs) as response:
-            response.raise_for_status()
+    async with get_session().request(*args, **kwargs) as response:
+        response.raise_for_status()
 
-            if json:
-                return await response.json()
-            return await response.read()
+        if json:
+            return await response.json()
+        return await response.read()
 
 
 def get_var_dict_from_ctx(ctx: ContextA, prefix: str = "_"):
@@ -44,20 +89,18 @@ def get_var_dict_from_ctx(ctx: ContextA, prefix: str = "_"):
     Returns the dict to be used in REPL for a given Context.
     """
 
-    raw_var_dict = {
-        "author": ctx.author,
-        "bot": ctx.bot,
-        "channel": ctx.channel,
-        "client": ctx.bot,
-        "ctx": ctx,
-        "find": discord.utils.find,
-        "get": discord.utils.get,
-        "guild": ctx.guild,
-        "me": ctx.me,
-        "message": ctx.message,
-        "msg": ctx.message,
-        "request": request,
-        "user": ctx.bot.user,
+    return {
+        f"{prefix}author": ctx.author,
+        f"{prefix}bot": ctx.bot,
+        f"{prefix}channel": ctx.channel,
+        f"{prefix}client": ctx.bot,
+        f"{prefix}ctx": ctx,
+        f"{prefix}find": discord.utils.find,
+        f"{prefix}get": discord.utils.get,
+        f"{prefix}guild": ctx.guild,
+        f"{prefix}me": ctx.me,
+        f"{prefix}message": ctx.message,
+        f"{prefix}msg": ctx.message,
+        f"{prefix}request": request,
+        f"{prefix}user": ctx.bot.user,
     }
-
-    return {f"{prefix}{k}": v for k, v in raw_var_dict.items()}
@@ -10,6 +10,9 @@ jishaku.cog loadability and functionality test
 """
 
 import asyncio
+import os
+from unittest import mock
+from unittest.mock import patch
 
 import discord
 import pytest
@@ -261,3 +264,86 @@ async def test_commands(bot):
         ctx.send.assert_called_once()
         text = ctx.send.call_args[0][0]
         assert "is set to OFF" in text
+
+
+@pytest.mark.asyncio
+async def test_repl_exit(bot):
+    cog = bot.get_cog("Jishaku")
+
+    with utils.mock_ctx() as ctx:
+        hint = mock.MagicMock(name="hint")
+        hint.content = "`exit`"
+
+        leave = mock.MagicMock(name="leave")
+        leave.content = "``quit()``"
+
+        with utils.mock_coro(bot, 'wait_for'), patch("jishaku.features.python.codeblock_converter") as converter:
+            bot.wait_for.coro.side_effect = [hint, leave]
+
+            await bot.get_command('jsk repl').callback(cog, ctx)
+
+            # exit commands should be handled before the code is ever parsed
+            converter.assert_not_called()
+
+        assert ctx.channel.id not in cog.repl_sessions
+
+        texts = [call[0][0] for call in ctx.send.call_args_list]
+        assert "Use `exit()` to exit." in texts
+        assert texts[-1] == "Exiting..."
+
+
+@pytest.mark.parametrize(
+    ("result", "uploaded"),
+    [
+        ("a" * 5000, True),
+        ("é" * 30000, False),  # below the limit in characters, but not once encoded
+        ("a\udc80" * 5000, False),  # lone surrogates can't be encoded at all
+    ],
+    ids=["ascii", "non-ascii", "surrogates"]
+)
+@pytest.mark.asyncio
+async def test_python_result_file(bot, result, uploaded):
+    cog = bot.get_cog("Jishaku")
+
+    with utils.mock_ctx() as ctx, \
+            patch.dict(os.environ, {"JISHAKU_FORCE_PAGINATOR": "false"}), \
+            patch("jishaku.features.python.Interface") as interface:
+        ctx.author.is_on_mobile.return_value = False
+        interface.return_value.send_to = mock.AsyncMock()
+
+        await cog.jsk_python_result_handling(ctx, result)
+
+        if uploaded:
+            assert isinstance(ctx.send.call_args[1]["file"], discord.File)
+            interface.assert_not_called()
+        else:
+            ctx.send.assert_not_called()
+            interface.return_value.send_to.assert_called_once_with(ctx)
+
+
+@pytest.mark.asyncio
+async def test_repl_retained_scope(bot):
+    cog = bot.get_cog("Jishaku")
+    cog.retain = True
+
+    with utils.mock_ctx() as ctx, patch.dict(os.environ, {"JISHAKU_NO_REACTION": "true"}):
+        code = mock.MagicMock(name="code")
+        code.content = "`1 + 1`"
+
+        leave = mock.MagicMock(name="leave")
+        leave.content = "`exit()`"
+
+        scopes = []
+
+        def respond(*args, **kwargs):
+            scopes.append(dict(cog._scope.globals))
+            return code if len(scopes) == 1 else leave
+
+        with utils.mock_coro(bot, 'wait_for'):
+            bot.wait_for.coro.side_effect = respond
+
+            await bot.get_command('jsk repl').callback(cog, ctx)
+
+        # the session's variables shouldn't be visible in the retained scope between messages
+        assert "message" not in scopes[1]
+        assert cog.last_result == 2
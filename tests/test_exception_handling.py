@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+jishaku.exception_handling test
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2021 Devon (Gorialis) R
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import asyncio
+import gc
+import os
+from unittest import mock
+from unittest.mock import patch
+
+import discord
+import pytest
+
+from jishaku import exception_handling
+
+
+@pytest.mark.parametrize(
+    ("text", "force_paginator", "uploaded"),
+    [
+        (("a" * 99 + "\n") * 50, "false", True),
+        (("é" * 99 + "\n") * 300, "false", False),  # below the limit in characters, but not once encoded
+        (("a\udc80" * 49 + "\n") * 50, "false", False),  # lone surrogates can't be encoded at all
+        (("a" * 99 + "\n") * 50, "true", False),
+    ],
+    ids=["ascii", "multi-byte", "surrogates", "force paginator"]
+)
+@pytest.mark.asyncio
+async def test_send_traceback_file(text, force_paginator, uploaded):
+    bot = mock.MagicMock(name="bot")
+    owner = mock.MagicMock(name="owner")
+    destination = mock.MagicMock(name="destination")
+    destination.send = mock.AsyncMock()
+
+    with patch.dict(os.environ, {"JISHAKU_FORCE_PAGINATOR": force_paginator}), \
+            patch.object(exception_handling, "Interface") as interface:
+        interface.return_value.send_to = mock.AsyncMock()
+
+        error = ValueError(text)
+        await exception_handling.send_traceback(bot, destination, -1, type(error), error, None, owner)
+
+        if uploaded:
+            kwargs = destination.send.call_args[1]
+            assert isinstance(kwargs["file"], discord.File)
+            assert kwargs["embed"].title == "Error"
+            interface.assert_not_called()
+        else:
+            destination.send.assert_not_called()
+            interface.return_value.send_to.assert_called_once_with(destination)
+
+
+def reaction_message(channel_id):
+    msg = mock.MagicMock(name="msg")
+    msg.channel.id = channel_id
+    msg.add_reaction = mock.AsyncMock()
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_reaction_saturated():
+    msg = reaction_message(1)
+    release = asyncio.Event()
+
+    async def add_reaction(reaction):
+        await release.wait()
+
+    msg.add_reaction.side_effect = add_reaction
+
+    pending = [
+        asyncio.ensure_future(exception_handling.attempt_add_reaction(msg, "a"))
+        for _ in range(exception_handling.REACTION_CONCURRENCY)
+    ]
+    await asyncio.sleep(0)
+
+    # progress reactions are dropped while the channel is saturated
+    await exception_handling.attempt_add_reaction(msg, "\N{BLACK RIGHT-POINTING TRIANGLE}", droppable=True)
+    assert msg.add_reaction.await_count == exception_handling.REACTION_CONCURRENCY
+
+    # but status reactions wait for their turn
+    status = asyncio.ensure_future(exception_handling.attempt_add_reaction(msg, "\N{WHITE HEAVY CHECK MARK}"))
+    await asyncio.sleep(0)
+    assert not status.done()
+
+    release.set()
+    await asyncio.gather(status, *pending)
+
+    msg.add_reaction.assert_awaited_with("\N{WHITE HEAVY CHECK MARK}")
+    assert msg.add_reaction.await_count == exception_handling.REACTION_CONCURRENCY + 1
+
+
+@pytest.mark.asyncio
+async def test_reaction_failure_releases():
+    msg = reaction_message(2)
+    msg.add_reaction.side_effect = discord.HTTPException(mock.MagicMock(), "failed")
+
+    for _ in range(exception_handling.REACTION_CONCURRENCY + 1):
+        assert await exception_handling.attempt_add_reaction(msg, "a", droppable=True) is None
+
+    # every failed attempt should have given its slot back
+    assert msg.add_reaction.await_count == exception_handling.REACTION_CONCURRENCY + 1
+    assert not exception_handling._REACTION_SEMAPHORES[2].locked()
+
+
+@pytest.mark.asyncio
+async def test_reaction_semaphore_released():
+    msg = reaction_message(3)
+
+    await exception_handling.attempt_add_reaction(msg, "a")
+    gc.collect()
+
+    # channels aren't tracked once nothing is reacting in them
+    assert 3 not in exception_handling._REACTION_SEMAPHORES
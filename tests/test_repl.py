@@ -9,14 +9,18 @@ jishaku.repl internal test
 
 """
 
+import asyncio
 import inspect
 import random
 import sys
+import threading
 
+import aiohttp
 import pytest
 from utils import mock_ctx
 
 from jishaku.repl import AsyncCodeExecutor, Scope, get_parent_var, get_var_dict_from_ctx
+from jishaku.repl.repl_builtins import close_session, get_session
 
 
 def upper_method():
@@ -121,6 +125,20 @@ async def test_executor_advanced(code, expected, arg_dict, scope):
         scope.clear_intersection(arg_dict)
 
 
+@pytest.mark.asyncio
+async def test_executor_convertables():
+    arg_dict = {'__user_mention_0': 3, '__role_mention_0': 4}
+    convertables = {'<@80088516616269824>': '__user_mention_0', '<@&80088516616269824>': '__role_mention_0'}
+
+    return_data = []
+    async for result in AsyncCodeExecutor(
+        '<@80088516616269824> * 10 + <@&80088516616269824>', arg_dict=arg_dict, convertables=convertables
+    ):
+        return_data.append(result)
+
+    assert return_data == [34]
+
+
 @pytest.mark.asyncio
 async def test_scope_copy(scope):
     scope2 = Scope()
@@ -176,3 +194,71 @@ async def test_var_dict(scope):
         assert scope.globals['_ctx'] is ctx
         assert scope.globals['_bot'] is ctx.bot
         assert scope.globals['_message'] is ctx.message
+
+
+@pytest.mark.asyncio
+async def test_session_reuse():
+    session = get_session()
+
+    try:
+        assert get_session() is session
+        assert not session.closed
+
+        # cookies shouldn't carry over from one request to the next
+        assert isinstance(session.cookie_jar, aiohttp.DummyCookieJar)
+    finally:
+        await close_session()
+
+    assert session.closed
+
+    new_session = get_session()
+
+    try:
+        assert new_session is not session
+        assert not new_session.closed
+    finally:
+        await close_session()
+
+
+def test_session_new_loop():
+    async def session():
+        return get_session()
+
+    first = asyncio.run(session())
+    second = asyncio.run(session())
+
+    try:
+        assert second is not first
+        # the first loop is gone, so its session can only be detached
+        assert first.closed
+    finally:
+        asyncio.run(close_session())
+
+
+def test_session_running_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+
+    async def session():
+        return get_session()
+
+    async def settle():
+        await asyncio.sleep(0.01)
+
+    try:
+        first = asyncio.run_coroutine_threadsafe(session(), loop).result()
+        second = asyncio.run(session())
+
+        try:
+            assert second is not first
+
+            # the first loop is still running, so the session should be closed on it
+            asyncio.run_coroutine_threadsafe(settle(), loop).result()
+            assert first.closed
+        finally:
+            asyncio.run(close_session())
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
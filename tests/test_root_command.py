@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""
+jishaku.features.root_command test
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:copyright: (c) 2021 Devon (Gorialis) R
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import pytest
+
+from jishaku.features.root_command import natural_size
+
+
+@pytest.mark.parametrize(
+    ("size", "text"),
+    [
+        (0, '0.00 B'),
+        (1023, '1023.00 B'),
+        (1024, '1.00 KiB'),
+        (12345678, '11.77 MiB'),
+        (1024 ** 5 - 1, '1024.00 TiB'),
+        (1024 ** 5, '1.00 PiB'),
+        (1024 ** 9, '1024.00 YiB')
+    ]
+)
+def test_natural_size(size, text):
+    assert natural_size(size) == text